@@ -6,11 +6,25 @@ No coding required - just fill in the forms!
 
 from flask import Flask, render_template, request, send_file, flash, redirect, url_for, jsonify
 import os
+import io
+import re
 import json
 import tempfile
 import zipfile
 import sys
+import time
+import atexit
+import shutil
+import secrets
+import hashlib
+import threading
+import contextlib
+import concurrent.futures
+import multiprocessing
+from collections import deque
 from datetime import datetime
+from functools import lru_cache
+from html import escape
 from urllib.parse import urljoin, urlparse
 from werkzeug.utils import secure_filename
 from xhtml2pdf import pisa
@@ -24,116 +38,327 @@ try:
 except ImportError:
     PYMUPDF_AVAILABLE = False
 
+# Try to import WeasyPrint - a much faster PDF layout engine than xhtml2pdf
+try:
+    from weasyprint import HTML
+    WEASYPRINT_AVAILABLE = True
+except (ImportError, OSError):  # OSError when native libs (pango/cairo) are missing
+    WEASYPRINT_AVAILABLE = False
+
+# Try to import orjson - a Rust JSON codec several times faster than the stdlib
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 app = Flask(__name__)
 app.secret_key = 'pdf-creator-secret-key'  # Change this in production
+app.config['MAX_CONTENT_LENGTH'] = 512 * 1024 * 1024  # Cap uploads at 512 MB
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 3600  # Let browsers cache served files
+# Behind nginx/apache, emit X-Sendfile headers so the web server delivers
+# file bytes via sendfile(2) instead of Python
+app.use_x_sendfile = os.environ.get('USE_X_SENDFILE') == '1'
+
+if ORJSON_AVAILABLE:
+    from flask.json.provider import JSONProvider
+
+    class OrjsonProvider(JSONProvider):
+        """Route jsonify and request.get_json through orjson."""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = OrjsonProvider(app)
 
 # Configuration
 UPLOAD_FOLDER = 'uploads'
 OUTPUT_FOLDER = 'generated_pdfs'
 CONFIG_FILE = 'pdf_configs.json'
 ALLOWED_EXTENSIONS = {'pdf', 'jpg', 'jpeg', 'png', 'gif'}
+# PDF rendering backend: 'weasyprint' (fast, preferred) or 'xhtml2pdf' (fallback)
+PDF_BACKEND = os.environ.get('PDF_BACKEND', 'weasyprint')
+
+# PDF generation is CPU-bound (HTML parse + layout), so run it in worker
+# processes to keep the Flask worker responsive and scale across cores
+EXECUTOR = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+
+# Image processing pool - Pillow releases the GIL around its C hotspots,
+# so threads overlap encode/resize work without pickling pixel buffers
+_IMG_POOL_WORKERS = os.cpu_count() or 1
+IMG_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=_IMG_POOL_WORKERS)
+
+# Per-process scratch space for request-scoped temp files. Prefers the
+# RAM-backed /dev/shm; per-request work gets a cheap subdirectory under
+# this one parent instead of a full mkdtemp/rmtree cycle per request.
+# Created lazily per pid rather than at import: under gunicorn --preload
+# the module imports once in the master and the workers fork from it, so
+# an import-time mkdtemp would be shared across workers (and the first
+# recycled worker's exit cleanup would delete it out from under the
+# others), and an import-time sweeper thread would not survive the fork.
+_scratch_state = {'pid': None, 'dir': None}
+_scratch_lock = threading.Lock()
+
+def _cleanup_scratch(pid, path):
+    """atexit hook: remove the scratch parent, but only in its owner process."""
+    if os.getpid() == pid:
+        shutil.rmtree(path, ignore_errors=True)
+
+def _scratch_parent():
+    """Return this process's scratch parent, creating it on first use."""
+    pid = os.getpid()
+    if _scratch_state['pid'] != pid:
+        with _scratch_lock:
+            if _scratch_state['pid'] != pid:
+                path = tempfile.mkdtemp(prefix='pdfcreator-',
+                                        dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+                atexit.register(_cleanup_scratch, pid, path)
+                threading.Thread(target=_sweep_scratch_dirs, args=(path,), daemon=True).start()
+                _scratch_state['dir'] = path
+                _scratch_state['pid'] = pid
+    return _scratch_state['dir']
+
+def _request_scratch_dir():
+    """Create a fresh subdirectory under the per-process scratch parent."""
+    path = os.path.join(_scratch_parent(), secrets.token_hex(8))
+    os.makedirs(path)
+    return path
+
+def _sweep_scratch_dirs(scratch_dir, max_age=600, interval=60):
+    """Periodically delete request scratch dirs older than max_age seconds."""
+    while True:
+        time.sleep(interval)
+        cutoff = time.time() - max_age
+        try:
+            with os.scandir(scratch_dir) as it:
+                for entry in it:
+                    if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                        shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError:
+            pass
+
+# Rendered-PDF cache: identical configs reuse the previous render
+PDF_CACHE_DIR = os.path.join(OUTPUT_FOLDER, '.cache')
+PDF_CACHE_MAX_BYTES = 512 * 1024 * 1024
 
 # Create directories if they don't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+
+# CSS for styling - built once at import time instead of per generation
+HEADER_CSS = """
+<style>
+@page {
+    size: A4;
+    margin: 2cm;
+}
+.pdf-section-header {
+    background-color: #e6f7ff;
+    padding: 15px 20px;
+    margin-bottom: 25px;
+    border-bottom: 2px solid #a0d9ff;
+    font-family: Arial, sans-serif;
+    color: #0056b3;
+    font-size: 1.2em;
+    font-weight: bold;
+    text-align: center;
+    page-break-before: always;
+}
+.pdf-section-header:first-of-type {
+    page-break-before: auto;
+}
+a {
+    color: #007bff;
+    text-decoration: underline;
+}
+body {
+    font-family: Arial, sans-serif;
+    line-height: 1.6;
+    color: #333;
+}
+img {
+    max-width: 100%;
+    height: auto;
+}
+.footer {
+    position: fixed;
+    bottom: 0;
+    left: 0;
+    right: 0;
+    height: 50px;
+    text-align: center;
+    font-size: 12px;
+    color: #666;
+}
+</style>
+"""
+
+# Template for the per-section header markup, filled in per section
+SECTION_HEADER_TEMPLATE = '<div class="pdf-section-header"><h2>{}</h2></div>'
+
+# Matches href="..."/src="..." attributes for the no-DOM rewrite fast path
+_URL_ATTR_RE = re.compile(r'(?i)\b(href|src)\s*=\s*"([^"]+)"')
+
+# Spots href=/src= attributes that are NOT double-quoted (single-quoted or
+# unquoted) - markup _URL_ATTR_RE can't rewrite, so it needs the full parser
+_ODD_QUOTED_URL_RE = re.compile(r'(?i)\b(?:href|src)\s*=\s*(?!")')
+
+def _rewrite_url_match(match, base_url):
+    """Regex callback: absolutize a matched href/src if it has no scheme."""
+    attr, url = match.group(1), match.group(2)
+    if urlparse(url).scheme:
+        return match.group(0)
+    return f'{attr}="{urljoin(base_url, url)}"'
+
+# Tokenizes "1, 3-5, 12" style page selections in one scan
+_PAGE_RANGE_RE = re.compile(r'(\d+)(?:\s*-\s*(\d+))?')
+
+def _parse_page_numbers(page_numbers_str):
+    """Parse a '1,3-5,12' style selection into a sorted list of page numbers."""
+    pages = set()
+    for match in _PAGE_RANGE_RE.finditer(page_numbers_str):
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else start
+        pages.update(range(start, end + 1))
+    return sorted(pages)
 
 def allowed_file(filename):
     """Check if a file extension is allowed."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# Parsed config cache, invalidated on file mtime change so every route
+# doesn't re-read and re-parse pdf_configs.json
+_CONFIG_CACHE = {'mtime': -1, 'data': []}
+
 def load_configs():
-    """Load saved PDF configurations."""
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
-    return []
+    """Load saved PDF configurations (cached until the file changes)."""
+    try:
+        mtime = os.stat(CONFIG_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    if mtime != _CONFIG_CACHE['mtime']:
+        with open(CONFIG_FILE, 'rb') as f:
+            raw = f.read()
+        _CONFIG_CACHE['data'] = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+        _CONFIG_CACHE['mtime'] = mtime
+    return _CONFIG_CACHE['data']
 
 def save_configs(configs):
     """Save PDF configurations."""
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(configs, f, indent=2)
+    if ORJSON_AVAILABLE:
+        with open(CONFIG_FILE, 'wb') as f:
+            f.write(orjson.dumps(configs, option=orjson.OPT_INDENT_2))
+    else:
+        with open(CONFIG_FILE, 'w') as f:
+            json.dump(configs, f, indent=2)
+    # Keep the cache hot instead of forcing a re-read on the next request
+    _CONFIG_CACHE['data'] = configs
+    _CONFIG_CACHE['mtime'] = os.stat(CONFIG_FILE).st_mtime_ns
+
+def _config_cache_key(config):
+    """Content hash of everything that determines the rendered PDF."""
+    hasher = hashlib.blake2b(digest_size=16)
+    payload = {k: v for k, v in config.items() if k not in ('id', 'created_at')}
+    if ORJSON_AVAILABLE:
+        hasher.update(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS))
+    else:
+        hasher.update(json.dumps(payload, sort_keys=True).encode())
+    # Section files are referenced by path, so hash their bytes too
+    for section in config.get('sections', []):
+        path = section.get('file_path')
+        if path and os.path.exists(path):
+            hasher.update(_read_section_file(path, os.path.getmtime(path)).encode())
+    return hasher.hexdigest()
+
+def _evict_pdf_cache():
+    """Drop the oldest cached PDFs until the cache fits its size budget."""
+    try:
+        entries = []
+        total = 0
+        with os.scandir(PDF_CACHE_DIR) as it:
+            for entry in it:
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        entries.sort()
+        while total > PDF_CACHE_MAX_BYTES and entries:
+            _, size, path = entries.pop(0)
+            os.remove(path)
+            total -= size
+    except OSError as e:
+        print(f"⚠️ PDF cache eviction failed: {e}")
+
+_evict_pdf_cache()
+
+@lru_cache(maxsize=64)
+def _read_section_file(path, mtime):
+    """Read a section HTML file, cached on (path, mtime) so repeated
+    generations of the same config skip disk I/O and decoding."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
 
 def generate_pdf_from_config(config):
     """Generate PDF from configuration."""
-    combined_html_parts = []
-    
-    # CSS for styling
-    header_css = """
-    <style>
-    @page {
-        size: A4;
-        margin: 2cm;
-    }
-    .pdf-section-header {
-        background-color: #e6f7ff;
-        padding: 15px 20px;
-        margin-bottom: 25px;
-        border-bottom: 2px solid #a0d9ff;
-        font-family: Arial, sans-serif;
-        color: #0056b3;
-        font-size: 1.2em;
-        font-weight: bold;
-        text-align: center;
-        page-break-before: always;
-    }
-    .pdf-section-header:first-of-type {
-        page-break-before: auto;
-    }
-    a {
-        color: #007bff;
-        text-decoration: underline;
-    }
-    body {
-        font-family: Arial, sans-serif;
-        line-height: 1.6;
-        color: #333;
-    }
-    img {
-        max-width: 100%;
-        height: auto;
-    }
-    .footer {
-        position: fixed;
-        bottom: 0;
-        left: 0;
-        right: 0;
-        height: 50px;
-        text-align: center;
-        font-size: 12px;
-        color: #666;
-    }
-    </style>
-    """
-    
+    # Sections are serialized incrementally into one buffer rather than
+    # collected as whole strings and joined again at the end
+    html_buf = io.StringIO()
+
+    output_filename = f"{config.get('name', 'document')}_{time.time_ns()}.pdf"
+
+    # Serve a previous render when the config content is unchanged
+    cache_key = _config_cache_key(config)
+    cache_path = os.path.join(PDF_CACHE_DIR, f'{cache_key}.pdf')
+    if os.path.exists(cache_path):
+        print(f"📄 Reusing cached PDF for config hash {cache_key}")
+        return cache_path, output_filename
+
+    # One human-readable timestamp per render, for the footer only
+    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
     for i, section in enumerate(config.get('sections', [])):
         html_source = section.get('html_content', '')
         base_url = section.get('base_url', '')
-        
+
         # Handle file upload
         if section.get('file_path') and os.path.exists(section['file_path']):
-            with open(section['file_path'], 'r', encoding='utf-8') as f:
-                html_source = f.read()
+            html_source = _read_section_file(section['file_path'], os.path.getmtime(section['file_path']))
         
         if not html_source:
             continue
-            
-        soup = BeautifulSoup(html_source, 'html.parser')
-        
-        # Convert relative URLs to absolute
+
+        header_html = SECTION_HEADER_TEMPLATE.format(escape(section.get('header_text', f'Section {i+1}')))
+
+        # Fast path: a simple HTML fragment needs no DOM at all - rewrite
+        # URLs with one compiled-regex pass and wrap it in a body string
+        lowered = html_source.lower()
+        if ('<script' not in lowered and '<!--' not in lowered and '<body' not in lowered
+                and not (base_url and _ODD_QUOTED_URL_RE.search(html_source))):
+            if base_url:
+                html_source = _URL_ATTR_RE.sub(lambda m: _rewrite_url_match(m, base_url), html_source)
+            html_buf.write(f'<body>{header_html}{html_source}</body>')
+            continue
+
+        # Complex markup - fall back to a full parse.
+        # lxml is a C-extension parser and much faster than html.parser on large sections
+        soup = BeautifulSoup(html_source, 'lxml')
+
+        # Convert relative URLs to absolute - single tree walk for both <a> and <img>
         if base_url:
-            for a_tag in soup.find_all('a', href=True):
-                if not urlparse(a_tag['href']).scheme:
-                    a_tag['href'] = urljoin(base_url, a_tag['href'])
-            for img_tag in soup.find_all('img', src=True):
-                if not urlparse(img_tag['src']).scheme:
-                    img_tag['src'] = urljoin(base_url, img_tag['src'])
-        
-        # Add section header
-        header_element = soup.new_tag('div', **{'class': 'pdf-section-header'})
-        header_text = soup.new_tag('h2')
-        header_text.string = section.get('header_text', f'Section {i+1}')
-        header_element.append(header_text)
-        
+            for tag in soup.find_all(('a', 'img')):
+                attr = 'href' if tag.name == 'a' else 'src'
+                url = tag.get(attr)
+                if url and not urlparse(url).scheme:
+                    tag[attr] = urljoin(base_url, url)
+
+        # Add section header - parse the prebuilt template instead of building tags one by one
+        header_fragment = BeautifulSoup(header_html, 'html.parser')
+        header_element = header_fragment.div
+
         # Ensure body exists
         if not soup.body:
             new_body = soup.new_tag('body')
@@ -146,7 +371,8 @@ def generate_pdf_from_config(config):
                 soup.append(new_body)
         
         soup.body.insert(0, header_element)
-        combined_html_parts.append(str(soup))
+        # .decode() serializes without the extra wrapping str() goes through
+        html_buf.write(soup.decode())
     
     # Combine HTML
     final_html = f"""<!DOCTYPE html>
@@ -154,28 +380,45 @@ def generate_pdf_from_config(config):
     <head>
         <meta charset='utf-8'>
         <title>{config.get('title', 'Generated PDF')}</title>
-        {header_css}
+        {HEADER_CSS}
     </head>
     <body>
-        {''.join(combined_html_parts)}
+        {html_buf.getvalue()}
         <div class="footer">
-            Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | PDF Creator
+            Generated on {generated_at} | PDF Creator
         </div>
     </body>
     </html>"""
     
     # Generate PDF
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    output_filename = f"{config.get('name', 'document')}_{timestamp}.pdf"
     output_path = os.path.join(OUTPUT_FOLDER, output_filename)
-    
+
+    _write_pdf(final_html, output_path)
+
+    # Hard-link the result into the cache; best-effort only
+    try:
+        os.link(output_path, cache_path)
+    except OSError:
+        pass
+
+    return output_path, output_filename
+
+def _write_pdf(final_html, output_path):
+    """Render final HTML to a PDF file using the configured backend.
+
+    WeasyPrint is an order of magnitude faster than xhtml2pdf on
+    non-trivial documents; xhtml2pdf remains as the fallback when
+    WeasyPrint (or its native libraries) is not installed.
+    """
+    if PDF_BACKEND == 'weasyprint' and WEASYPRINT_AVAILABLE:
+        HTML(string=final_html, base_url=os.getcwd()).write_pdf(output_path)
+        return
+
     with open(output_path, "w+b") as result_file:
         pisa_status = pisa.CreatePDF(final_html, dest=result_file, encoding='utf-8')
-        
+
         if pisa_status.err:
             raise Exception(f"PDF generation failed: {pisa_status.err}")
-    
-    return output_path, output_filename
 
 @app.route('/')
 def index():
@@ -260,7 +503,7 @@ def save_config():
     try:
         # Get form data
         config = {
-            'id': datetime.now().strftime('%Y%m%d_%H%M%S'),
+            'id': str(time.time_ns()),
             'name': request.form.get('name', 'Untitled'),
             'title': request.form.get('title', 'Generated PDF'),
             'description': request.form.get('description', ''),
@@ -312,16 +555,46 @@ def generate_pdf(config_id):
         if not config:
             flash('Configuration not found!', 'error')
             return redirect(url_for('index'))
-        
-        output_path, filename = generate_pdf_from_config(config)
+
+        future = EXECUTOR.submit(generate_pdf_from_config, config)
+        output_path, filename = future.result()
         flash(f'PDF generated successfully: {filename}', 'success')
         
-        return send_file(output_path, as_attachment=True, download_name=filename)
-        
+        return send_file(output_path, as_attachment=True, download_name=filename,
+                         conditional=True)
+
     except Exception as e:
         flash(f'Error generating PDF: {str(e)}', 'error')
         return redirect(url_for('index'))
 
+@app.route('/generate_all')
+def generate_all():
+    """Generate PDFs for every saved configuration in parallel and return a ZIP."""
+    try:
+        configs = load_configs()
+        if not configs:
+            flash('No saved configurations to generate!', 'error')
+            return redirect(url_for('index'))
+
+        # Each PDF is independent, so fan out across the process pool
+        futures = [EXECUTOR.submit(generate_pdf_from_config, config) for config in configs]
+
+        zip_filename = f"all_pdfs_{time.time_ns()}.zip"
+        zip_path = os.path.join(OUTPUT_FOLDER, zip_filename)
+
+        # ZIP_STORED - PDFs are already compressed, DEFLATE would just burn CPU
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as zipf:
+            for future in concurrent.futures.as_completed(futures):
+                output_path, filename = future.result()
+                zipf.write(output_path, filename)
+
+        return send_file(zip_path, as_attachment=True, download_name=zip_filename,
+                         conditional=True)
+
+    except Exception as e:
+        flash(f'Error generating PDFs: {str(e)}', 'error')
+        return redirect(url_for('index'))
+
 @app.route('/delete/<config_id>')
 def delete_config(config_id):
     """Delete a saved configuration."""
@@ -352,28 +625,62 @@ def quick_generate():
         if not config['sections'][0]['html_content']:
             flash('Please provide HTML content!', 'error')
             return redirect(url_for('index'))
-        
-        output_path, filename = generate_pdf_from_config(config)
-        return send_file(output_path, as_attachment=True, download_name=filename)
+
+        future = EXECUTOR.submit(generate_pdf_from_config, config)
+        output_path, filename = future.result()
+        return send_file(output_path, as_attachment=True, download_name=filename,
+                         conditional=True)
         
     except Exception as e:
         flash(f'Error generating PDF: {str(e)}', 'error')
         return redirect(url_for('index'))
 
-def extract_pages_from_pdf(pdf_path, output_dir, prefix="", extract_mode="all", page_numbers=None, dpi=150):
+# Below this page count the fork overhead of a pool outweighs the win
+_PARALLEL_RENDER_MIN_PAGES = 4
+
+def _page_filename(prefix, extract_mode, page_num):
+    """Build the output filename for an extracted page."""
+    if extract_mode == "single":
+        return f"{prefix}.png"
+    return f"{prefix}page_{page_num}.png"
+
+def _render_page(args):
+    """Rasterize a single PDF page in a worker process.
+
+    fitz.Document handles are not fork-safe, so each worker opens its
+    own; the raw pixmap samples are returned for the parent to wrap in
+    a PIL image.
     """
-    Extract pages from PDF as images
-    
+    pdf_path, page_num, dpi = args
+    import fitz
+    doc = fitz.open(pdf_path)
+    try:
+        page = doc.load_page(page_num - 1)
+        scale_factor = dpi / 72.0
+        pix = page.get_pixmap(matrix=fitz.Matrix(scale_factor, scale_factor))
+        mode = 'RGB' if pix.alpha == 0 else 'RGBA'
+        return page_num, mode, pix.width, pix.height, pix.samples
+    finally:
+        doc.close()
+
+def iter_pages_from_pdf(pdf_path, output_dir, prefix="", extract_mode="all", page_numbers=None, dpi=150):
+    """
+    Yield pages extracted from a PDF as in-memory PIL images
+
+    Streaming one page at a time keeps peak memory at O(one page) - an
+    A4 page at 300 DPI is ~35 MB uncompressed, so buffering a long PDF
+    would spike RSS by gigabytes.
+
     Args:
         pdf_path: Path to PDF file
-        output_dir: Output directory for images
+        output_dir: Output directory (kept for filename bookkeeping)
         prefix: Prefix for output filenames
-        extract_mode: "all", "single", "multiple" 
+        extract_mode: "all", "single", "multiple"
         page_numbers: List of page numbers to extract (1-based)
         dpi: Resolution for extracted images
-    
-    Returns:
-        List of extracted page info dictionaries
+
+    Yields:
+        Extracted page info dictionaries with an 'image' PIL object
     """
     global fitz, PYMUPDF_AVAILABLE
     try:
@@ -383,134 +690,214 @@ def extract_pages_from_pdf(pdf_path, output_dir, prefix="", extract_mode="all",
             subprocess.check_call([sys.executable, "-m", "pip", "install", "PyMuPDF"])
             import fitz
             PYMUPDF_AVAILABLE = True
-        
+
         print(f"📄 Extracting pages from PDF: {pdf_path}")
         print(f"📐 PDF Page settings: DPI={dpi}, Mode={extract_mode}")
-        
-        # Open PDF
-        pdf_document = fitz.open(pdf_path)
-        total_pages = len(pdf_document)
-        extracted_pages = []
-        
-        # Determine which pages to extract
-        if extract_mode == "single" and page_numbers:
-            pages_to_extract = [page_numbers[0]]  # First page only
-        elif extract_mode == "multiple" and page_numbers:
-            pages_to_extract = page_numbers
-        else:  # extract_mode == "all"
-            pages_to_extract = list(range(1, total_pages + 1))
-        
-        for page_num in pages_to_extract:
-            if page_num < 1 or page_num > total_pages:
-                continue
-                
-            # Convert to 0-based index
-            page_index = page_num - 1
-            page = pdf_document.load_page(page_index)
-            
-            # Create high-quality image of the page based on DPI
-            # Calculate scaling factor based on desired DPI (72 is PDF default)
-            scale_factor = dpi / 72.0
-            mat = fitz.Matrix(scale_factor, scale_factor)
-            pix = page.get_pixmap(matrix=mat)
-            
-            # Convert to PNG
-            img_data = pix.tobytes("png")
-            
-            # Save page as image
-            if extract_mode == "single":
-                img_filename = f"{prefix}.png"
-            else:
-                img_filename = f"{prefix}page_{page_num}.png"
-                
-            img_path = os.path.join(output_dir, img_filename)
-            
-            with open(img_path, "wb") as img_file:
-                img_file.write(img_data)
-            
-            extracted_pages.append({
-                'path': img_path,
-                'filename': img_filename,
+
+        extracted_count = 0
+        with contextlib.closing(fitz.open(pdf_path)) as pdf_document:
+            total_pages = len(pdf_document)
+
+            # Determine which pages to extract
+            if extract_mode == "single" and page_numbers:
+                pages_to_extract = [page_numbers[0]]  # First page only
+            elif extract_mode == "multiple" and page_numbers:
+                pages_to_extract = page_numbers
+            else:  # extract_mode == "all"
+                pages_to_extract = list(range(1, total_pages + 1))
+
+            pages_to_extract = [p for p in pages_to_extract if 1 <= p <= total_pages]
+
+            if len(pages_to_extract) < _PARALLEL_RENDER_MIN_PAGES:
+                # Serial path for small PDFs - forking a pool costs more
+                # than it saves here
+                for page_num in pages_to_extract:
+                    # Convert to 0-based index
+                    page_index = page_num - 1
+                    page = pdf_document.load_page(page_index)
+
+                    # Create high-quality image of the page based on DPI
+                    # Calculate scaling factor based on desired DPI (72 is PDF default)
+                    scale_factor = dpi / 72.0
+                    mat = fitz.Matrix(scale_factor, scale_factor)
+                    pix = page.get_pixmap(matrix=mat)
+
+                    # Wrap the raw pixmap samples in a PIL image directly - no
+                    # intermediate PNG encode to disk and decode back
+                    img = Image.frombytes('RGB' if pix.alpha == 0 else 'RGBA',
+                                          (pix.width, pix.height), pix.samples)
+
+                    yield {
+                        'image': img,
+                        'filename': _page_filename(prefix, extract_mode, page_num),
+                        'page': page_num,
+                        'size': f"{pix.width}x{pix.height}",
+                        'dpi': dpi
+                    }
+                    extracted_count += 1
+
+                    # Drop pixmap/page references before rendering the next page
+                    pix = None
+                    page = None
+
+                print(f"✅ Extracted {extracted_count} pages from PDF")
+                return
+
+        # Parallel path - rasterization is CPU-bound in MuPDF's C code and
+        # each page is independent, so split the page list across workers.
+        # The parent document is closed above; workers open their own handles.
+        nworkers = min(os.cpu_count(), len(pages_to_extract))
+
+        def _page_info(result):
+            page_num, img_mode, width, height, samples = result
+            return {
+                'image': Image.frombytes(img_mode, (width, height), samples),
+                'filename': _page_filename(prefix, extract_mode, page_num),
                 'page': page_num,
-                'size': f"{pix.width}x{pix.height}",
+                'size': f"{width}x{height}",
                 'dpi': dpi
-            })
-            
-            pix = None
-        
-        pdf_document.close()
-        print(f"✅ Extracted {len(extracted_pages)} pages from PDF")
-        return extracted_pages
-        
+            }
+
+        with multiprocessing.Pool(nworkers) as pool:
+            # Window of at most one in-flight render per worker: imap queues
+            # every task up front and buffers finished pages without limit
+            # when the consumer is slower than the renderers, which would pin
+            # all uncompressed pages at once and defeat the streaming design
+            pending = deque()
+            for page_num in pages_to_extract:
+                if len(pending) >= nworkers:
+                    yield _page_info(pending.popleft().get())
+                    extracted_count += 1
+                pending.append(pool.apply_async(_render_page, ((pdf_path, page_num, dpi),)))
+            while pending:
+                yield _page_info(pending.popleft().get())
+                extracted_count += 1
+
+        print(f"✅ Extracted {extracted_count} pages from PDF")
+
     except Exception as e:
         print(f"❌ Error extracting pages from PDF: {e}")
-        return []
 
-def process_image_basic(input_path, output_path, width=None, height=None, quality=95):
+# Magic bytes for formats that can be passed through as a plain byte copy
+_IMAGE_SIGNATURES = {
+    'jpg': b'\xff\xd8\xff',
+    'jpeg': b'\xff\xd8\xff',
+    'png': b'\x89PNG\r\n\x1a\n',
+    'gif': b'GIF8',
+}
+
+def _is_passthrough_copy(input_path, output_path, quality):
+    """True when a byte copy of the source is identical to decode + re-encode:
+    no resize was requested, the source already has the output format, and
+    no quality change applies (95 is the caller default, i.e. 'unchanged')."""
+    output_ext = output_path.rsplit('.', 1)[-1].lower()
+    signature = _IMAGE_SIGNATURES.get(output_ext)
+    if signature is None:
+        return False
+    if output_ext in ('jpg', 'jpeg') and quality != 95:
+        return False
+    try:
+        with open(input_path, 'rb') as f:
+            return f.read(len(signature)) == signature
+    except OSError:
+        return False
+
+def process_image_basic(input_source, output_path, width=None, height=None, quality=95):
     """
     Basic image processing with resize and quality options
-    
+
     Args:
-        input_path: Path to input image
+        input_source: Path to input image, or an already-decoded PIL Image
         output_path: Path to save processed image
         width: Target width (optional)
         height: Target height (optional)
         quality: JPEG quality (1-100)
-    
+
     Returns:
         True if successful, False otherwise
     """
     try:
-        print(f"🖼️ Processing image: {input_path} -> {output_path}")
-        
-        with Image.open(input_path) as img:
-            original_size = img.size
-            original_format = img.format
-            
-            # Calculate new size if dimensions specified
-            new_size = original_size
-            if width or height:
-                if width and height:
-                    new_size = (int(width), int(height))
-                elif width:
-                    # Keep aspect ratio
-                    ratio = int(width) / original_size[0]
-                    new_size = (int(width), int(original_size[1] * ratio))
-                elif height:
-                    # Keep aspect ratio
-                    ratio = int(height) / original_size[1]
-                    new_size = (int(original_size[0] * ratio), int(height))
-            
-            # Resize if needed
-            if new_size != original_size:
-                img = img.resize(new_size, Image.Resampling.LANCZOS)
-            
-            # Determine output format from file extension
-            output_ext = output_path.rsplit('.', 1)[-1].lower()
-            if output_ext == 'jpg' or output_ext == 'jpeg':
-                save_format = 'JPEG'
-                # Handle transparency for JPEG
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                    img = background
-                img.save(output_path, format=save_format, quality=quality, optimize=True)
-            elif output_ext == 'png':
-                img.save(output_path, format='PNG', optimize=True)
-            else:
-                # Default to original format
-                save_format = original_format if original_format else 'PNG'
-                img.save(output_path, format=save_format)
-        
+        print(f"🖼️ Processing image: {input_source} -> {output_path}")
+
+        # Pass-through fast path: nothing to resize or re-encode, so a
+        # byte copy avoids the full codec round-trip
+        if (width is None and height is None
+                and not isinstance(input_source, Image.Image)
+                and _is_passthrough_copy(input_source, output_path, quality)):
+            shutil.copyfile(input_source, output_path)
+            print(f"✅ Image copied without re-encoding: {output_path}")
+            return True
+
+        if isinstance(input_source, Image.Image):
+            # Already decoded (e.g. a rasterized PDF page) - skip re-opening
+            _process_opened_image(input_source, output_path, width, height, quality)
+        else:
+            with Image.open(input_source) as img:
+                _process_opened_image(img, output_path, width, height, quality)
+
         print(f"✅ Image processed successfully: {output_path}")
         return True
-        
+
     except Exception as e:
         print(f"❌ Error processing image: {e}")
         return False
 
+def _process_opened_image(img, output_path, width, height, quality):
+    """Resize an open PIL image and save it in the format implied by output_path."""
+    original_size = img.size
+    original_format = img.format
+
+    # Calculate new size if dimensions specified
+    new_size = original_size
+    if width or height:
+        if width and height:
+            new_size = (int(width), int(height))
+        elif width:
+            # Keep aspect ratio
+            ratio = int(width) / original_size[0]
+            new_size = (int(width), int(original_size[1] * ratio))
+        elif height:
+            # Keep aspect ratio
+            ratio = int(height) / original_size[1]
+            new_size = (int(original_size[0] * ratio), int(height))
+
+    # For JPEG sources shrinking by 2x or more, let libjpeg decode at a
+    # reduced DCT scale (1/2, 1/4, 1/8) instead of decoding pixels that
+    # the resize below would throw away
+    if (img.format == 'JPEG' and new_size != original_size
+            and original_size[0] >= 2 * new_size[0]
+            and original_size[1] >= 2 * new_size[1]):
+        img.draft('RGB', new_size)
+        original_size = img.size
+
+    # Resize if needed. For aggressive downscales (>2x) BILINEAR is
+    # visually equivalent after the shrink and several times cheaper
+    # than LANCZOS; keep LANCZOS where detail is preserved.
+    if new_size != original_size:
+        shrink_ratio = min(original_size[0] / new_size[0], original_size[1] / new_size[1])
+        resample = Image.Resampling.BILINEAR if shrink_ratio > 2 else Image.Resampling.LANCZOS
+        img = img.resize(new_size, resample)
+
+    # Determine output format from file extension
+    output_ext = output_path.rsplit('.', 1)[-1].lower()
+    if output_ext == 'jpg' or output_ext == 'jpeg':
+        save_format = 'JPEG'
+        # Handle transparency for JPEG
+        if img.mode in ('RGBA', 'LA', 'P'):
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+            img = background
+        img.save(output_path, format=save_format, quality=quality, optimize=True)
+    elif output_ext == 'png':
+        # compress_level=1 cuts libpng CPU heavily with a modest size increase
+        img.save(output_path, format='PNG', compress_level=1)
+    else:
+        # Default to original format
+        save_format = original_format if original_format else 'PNG'
+        img.save(output_path, format=save_format)
+
 @app.route('/export_images', methods=['POST'])
 def export_images():
     """Export images functionality for single page export and image processing."""
@@ -545,21 +932,8 @@ def export_images():
             except (ValueError, TypeError):
                 pdf_dpi = 150
         
-        # Parse page numbers
-        page_numbers = []
-        if page_numbers_str:
-            try:
-                for part in page_numbers_str.split(','):
-                    part = part.strip()
-                    if '-' in part:
-                        start, end = map(int, part.split('-'))
-                        page_numbers.extend(range(start, end + 1))
-                    else:
-                        page_numbers.append(int(part))
-                page_numbers = sorted(list(set(page_numbers)))  # Remove duplicates and sort
-            except ValueError:
-                print(f"⚠️ Invalid page numbers format: {page_numbers_str}")
-                page_numbers = []
+        # Parse page numbers - one compiled-regex scan, deduped via the set
+        page_numbers = _parse_page_numbers(page_numbers_str) if page_numbers_str else []
         
         # Get image processing options
         image_width = request.form.get('image_width')
@@ -567,132 +941,169 @@ def export_images():
         image_quality = int(request.form.get('image_quality', 95))
         
         processed_files = []
-        temp_dir = tempfile.mkdtemp()
-        
-        try:
-            # Process each uploaded file
-            for file in files:
-                if file and allowed_file(file.filename):
-                    filename = secure_filename(file.filename)
-                    file_ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+        pending_jobs = []  # (future, file info) pairs, settled in submission order
+
+        def _absorb_pending(limit):
+            """Settle the oldest pending encodes until at most `limit` remain.
+
+            Called before each submit as backpressure: without it every
+            rasterized page sits uncompressed in a pending future and the
+            streaming generator's bounded-memory property is lost.
+            """
+            while len(pending_jobs) > limit:
+                future, file_info = pending_jobs.pop(0)
+                if future.result():
+                    processed_files.append(file_info)
+                    print(f"✅ Processed: {file_info['original']} -> {file_info['processed']}")
+                else:
+                    print(f"❌ Failed to process: {file_info['original']}")
+        # Scratch subdir under the shared parent; the background sweeper
+        # reclaims it, so no per-request rmtree on the response path
+        temp_dir = _request_scratch_dir()
+
+        # Submit each file's processing to the image pool so Pillow
+        # encode/resize work overlaps with rasterization and upload I/O
+        for file in files:
+            if file and allowed_file(file.filename):
+                filename = secure_filename(file.filename)
+                file_ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+
+                if file_ext in ['jpg', 'jpeg', 'png', 'gif']:
+                    # Process regular image
+                    original_path = os.path.join(temp_dir, filename)
+                    file.save(original_path)
+
+                    # Generate output filename
+                    base_name = filename.rsplit('.', 1)[0]
+                    output_filename = f"{base_name}_processed.{file_ext}"
+                    output_path = os.path.join(OUTPUT_FOLDER, output_filename)
+
+                    _absorb_pending(_IMG_POOL_WORKERS - 1)
+                    future = IMG_POOL.submit(process_image_basic, original_path, output_path,
+                                             image_width, image_height, image_quality)
+                    pending_jobs.append((future, {
+                        'original': filename,
+                        'processed': output_filename,
+                        'path': output_path,
+                        'type': 'image'
+                    }))
+
+                elif file_ext == 'pdf':
+                    # Process PDF based on extraction mode
+                    pdf_path = os.path.join(temp_dir, filename)
+                    file.save(pdf_path)
                     
-                    if file_ext in ['jpg', 'jpeg', 'png', 'gif']:
-                        # Process regular image
-                        original_path = os.path.join(temp_dir, filename)
-                        file.save(original_path)
-                        
-                        # Generate output filename
-                        base_name = filename.rsplit('.', 1)[0]
-                        output_filename = f"{base_name}_processed.{file_ext}"
-                        output_path = os.path.join(OUTPUT_FOLDER, output_filename)
-                        
-                        # Process image
-                        if process_image_basic(original_path, output_path, image_width, image_height, image_quality):
-                            processed_files.append({
-                                'original': filename,
-                                'processed': output_filename,
-                                'path': output_path,
-                                'type': 'image'
-                            })
-                            print(f"✅ Processed image: {filename} -> {output_filename}")
-                        else:
-                            print(f"❌ Failed to process image: {filename}")
+                    pdf_base_name = filename.rsplit('.', 1)[0]
+                    extract_dir = os.path.join(temp_dir, f"{pdf_base_name}_extracted")
+                    os.makedirs(extract_dir, exist_ok=True)
                     
-                    elif file_ext == 'pdf':
-                        # Process PDF based on extraction mode
-                        pdf_path = os.path.join(temp_dir, filename)
-                        file.save(pdf_path)
-                        
-                        pdf_base_name = filename.rsplit('.', 1)[0]
-                        extract_dir = os.path.join(temp_dir, f"{pdf_base_name}_extracted")
-                        os.makedirs(extract_dir, exist_ok=True)
-                        
-                        # Determine extraction mode
-                        if pdf_extraction_mode == 'pages_single':
-                            extract_mode = 'single'
-                            pages_to_extract = page_numbers[:1] if page_numbers else [1]
-                        elif pdf_extraction_mode == 'pages_multiple':
-                            extract_mode = 'multiple'
-                            pages_to_extract = page_numbers if page_numbers else None
-                        else:  # pages_all
-                            extract_mode = 'all'
-                            pages_to_extract = None
-                        
-                        # Extract pages
-                        extracted_pages = extract_pages_from_pdf(
-                            pdf_path, extract_dir, pdf_base_name, extract_mode, pages_to_extract, dpi=pdf_dpi
-                        )
-                        
-                        # Process each extracted page
-                        for page_info in extracted_pages:
-                            base_name = page_info['filename'].rsplit('.', 1)[0]
-                            output_filename = f"{base_name}_processed.png"
-                            output_path = os.path.join(OUTPUT_FOLDER, output_filename)
-                            
-                            # Process page image
-                            if process_image_basic(page_info['path'], output_path, image_width, image_height, image_quality):
-                                processed_files.append({
-                                    'original': f"{filename} (Page {page_info['page']})",
-                                    'processed': output_filename,
-                                    'path': output_path,
-                                    'type': 'pdf_page'
-                                })
-                                print(f"✅ Processed PDF page: {page_info['filename']} -> {output_filename}")
-            
-            if not processed_files:
-                return jsonify({'error': 'No valid files found to process'}), 400
-            
-            # Create response based on number of files
-            if len(processed_files) == 1:
-                # Single file - direct download
-                file_info = processed_files[0]
-                return jsonify({
-                    'success': True,
-                    'type': 'single',
-                    'filename': file_info['processed'],
-                    'download_url': f"/download/{file_info['processed']}",
-                    'original': file_info['original']
-                })
-            else:
-                # Multiple files - create ZIP
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                zip_filename = f"processed_files_{timestamp}.zip"
-                zip_path = os.path.join(OUTPUT_FOLDER, zip_filename)
-                
-                with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    for file_info in processed_files:
-                        zipf.write(file_info['path'], file_info['processed'])
-                
-                return jsonify({
-                    'success': True,
-                    'type': 'multiple',
-                    'filename': zip_filename,
-                    'download_url': f"/download/{zip_filename}",
-                    'count': len(processed_files),
-                    'summary': {
-                        'images': len([f for f in processed_files if f['type'] == 'image']),
-                        'pdf_pages': len([f for f in processed_files if f['type'] == 'pdf_page'])
-                    }
-                })
-        
-        finally:
-            # Cleanup temp directory
-            import shutil
-            shutil.rmtree(temp_dir, ignore_errors=True)
+                    # Determine extraction mode
+                    if pdf_extraction_mode == 'pages_single':
+                        extract_mode = 'single'
+                        pages_to_extract = page_numbers[:1] if page_numbers else [1]
+                    elif pdf_extraction_mode == 'pages_multiple':
+                        extract_mode = 'multiple'
+                        pages_to_extract = page_numbers if page_numbers else None
+                    else:  # pages_all
+                        extract_mode = 'all'
+                        pages_to_extract = None
+                    
+                    # Process each page as it is rendered so only one
+                    # uncompressed page is in memory at a time
+                    for page_info in iter_pages_from_pdf(
+                        pdf_path, extract_dir, pdf_base_name, extract_mode, pages_to_extract, dpi=pdf_dpi
+                    ):
+                        base_name = page_info['filename'].rsplit('.', 1)[0]
+                        output_filename = f"{base_name}_processed.png"
+                        output_path = os.path.join(OUTPUT_FOLDER, output_filename)
+
+                        # Encode this page on the pool while the next one
+                        # rasterizes, keeping in-flight pages bounded
+                        _absorb_pending(_IMG_POOL_WORKERS - 1)
+                        future = IMG_POOL.submit(process_image_basic, page_info['image'], output_path,
+                                                 image_width, image_height, image_quality)
+                        pending_jobs.append((future, {
+                            'original': f"{filename} (Page {page_info['page']})",
+                            'processed': output_filename,
+                            'path': output_path,
+                            'type': 'pdf_page'
+                        }))
+
+        # Settle whatever is still in flight, in submission order
+        _absorb_pending(0)
+
+        if not processed_files:
+            return jsonify({'error': 'No valid files found to process'}), 400
         
+        # Create response based on number of files
+        if len(processed_files) == 1:
+            # Single file - direct download
+            file_info = processed_files[0]
+            return jsonify({
+                'success': True,
+                'type': 'single',
+                'filename': file_info['processed'],
+                'download_url': f"/download/{file_info['processed']}",
+                'original': file_info['original']
+            })
+        else:
+            # Multiple files - stream a ZIP straight into the response
+            # instead of writing it to OUTPUT_FOLDER and reading it back.
+            # Spills to disk only past 64 MB; ZIP_STORED because PNG/JPEG
+            # payloads are already compressed and DEFLATE just burns CPU.
+            zip_filename = f"processed_files_{time.time_ns()}.zip"
+
+            spooled = tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024)
+            with zipfile.ZipFile(spooled, 'w', zipfile.ZIP_STORED) as zipf:
+                for file_info in processed_files:
+                    zipf.write(file_info['path'], file_info['processed'])
+            spooled.seek(0)
+
+            return send_file(spooled, mimetype='application/zip',
+                             as_attachment=True, download_name=zip_filename)
+    
     except Exception as e:
         print(f"❌ Error in export_images: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
+@app.route('/upload_stream', methods=['POST', 'PUT'])
+def upload_stream():
+    """Stream a raw file body straight into UPLOAD_FOLDER.
+
+    Skips werkzeug's multipart parser, which spools large uploads
+    through temp files before we copy them again; here the body goes
+    to its final destination in 1 MB chunks with no staging.
+    The filename comes from the X-Filename header.
+    """
+    try:
+        filename = secure_filename(request.headers.get('X-Filename', ''))
+        if not filename or not allowed_file(filename):
+            return jsonify({'error': 'Missing or disallowed filename'}), 400
+
+        dest_path = os.path.join(UPLOAD_FOLDER, filename)
+        with open(dest_path, 'wb') as f:
+            shutil.copyfileobj(request.stream, f, length=1 << 20)
+
+        return jsonify({
+            'success': True,
+            'filename': filename,
+            'size': os.path.getsize(dest_path)
+        })
+
+    except Exception as e:
+        return jsonify({'error': f'Error saving upload: {str(e)}'}), 500
+
 @app.route('/download/<filename>')
 def download_file(filename):
     """Download a file from the output folder."""
     try:
         file_path = os.path.join(OUTPUT_FOLDER, filename)
         if os.path.exists(file_path):
-            return send_file(file_path, as_attachment=True)
+            # conditional=True adds ETag/Last-Modified so repeat downloads
+            # become 304s, and enables ranged requests
+            return send_file(file_path, as_attachment=True, conditional=True)
         else:
             return jsonify({'error': 'File not found'}), 404
     except Exception as e:
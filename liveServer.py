@@ -1,17 +1,28 @@
 from flask import Flask, render_template, request, send_file, flash, redirect, send_from_directory, url_for, jsonify
 import os
+import re
 import json
 import tempfile
 import zipfile
 import sys
 import shutil
 import subprocess
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import count
+from operator import itemgetter
 from urllib.parse import urljoin, urlparse
 from werkzeug.utils import secure_filename
 from xhtml2pdf import pisa
 from bs4 import BeautifulSoup
-from PIL import Image
+from PIL import Image, UnidentifiedImageError, features as pil_features
+
+# Reject decompression-bomb uploads before they allocate gigabytes of
+# pixel data; Pillow raises DecompressionBombError past twice this count
+# (warns past it), giving each request a predictable memory ceiling.
+Image.MAX_IMAGE_PIXELS = 50_000_000
 
 # Try to import PyMuPDF for PDF processing
 try:
@@ -20,6 +31,24 @@ try:
 except ImportError:
     PYMUPDF_AVAILABLE = False
 
+# Try to import NumPy for vectorized pixel work
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Try to import PyTurboJPEG - libjpeg-turbo's SIMD codec, several times faster
+# than Pillow's bundled libjpeg for both decode and encode. The handle is
+# expensive to create, so build the singleton once at import time.
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJSAMP_420, TJSAMP_444
+    _TJ = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except Exception:  # missing wheel or missing native libturbojpeg
+    _TJ = None
+    TURBOJPEG_AVAILABLE = False
+
 # --- Robust Pathing Helper Function for PyInstaller ---
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -33,6 +62,15 @@ def resource_path(relative_path):
 
 app = Flask(__name__)
 app.secret_key = 'pdf-creator-secret-key'  # Change this in production
+# Output filenames embed a timestamp, so once written they never change -
+# let browsers cache served files for a year by default.
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000
+# With USE_X_SENDFILE=1 Werkzeug emits an X-Sendfile header instead of
+# streaming file bodies through the worker; the front-end server (nginx
+# with an internal location on OUTPUT_FOLDER, or Apache mod_xsendfile)
+# then ships the bytes via zero-copy sendfile(2). Off by default so the
+# bare dev server keeps serving files itself.
+app.use_x_sendfile = os.environ.get('USE_X_SENDFILE') == '1'
 
 # --- Path Configuration (Updated for Robustness) ---
 PUPPETEER_SCRIPT_DIR = resource_path('puppeteer_pdf_generator')
@@ -46,10 +84,69 @@ CONFIG_FILE = resource_path('pdf_configs.json')
 # Added .html and .htm to allowed extensions for preview functionality
 ALLOWED_EXTENSIONS = {'pdf', 'jpg', 'jpeg', 'png', 'gif', 'html', 'htm', 'zip'}
 
+# Extension groups and quality presets used on the export_images hot path
+_ALLOWED_IMG_EXT = frozenset({'jpg', 'jpeg', 'png', 'gif'})
+_PDF_EXT = 'pdf'
+_DPI_MAP = {'high': 300, 'medium': 150, 'low': 72}
+# Matches "3" or "3-7" tokens in a page selection like "1,3-5, 9"
+_PAGE_RE = re.compile(r'(\d+)(?:\s*-\s*(\d+))?')
+
+# Monotonic per-process suffix so two worker threads stamping an output
+# filename in the same nanosecond still get distinct names
+_stamp_counter = count()
+
+def _output_stamp():
+    """Cheap unique filename stamp - no datetime allocation or strftime."""
+    return f"{time.time_ns()}_{next(_stamp_counter)}"
+
+# Per-upload record: sanitized name, split extension and stem computed once,
+# so the worker threads never re-parse filenames
+_UploadItem = namedtuple('_UploadItem', 'storage name ext base')
+
+# Output extension -> Pillow format name, for matching sources to targets
+_FMT_BY_EXT = {'jpg': 'JPEG', 'jpeg': 'JPEG', 'png': 'PNG', 'gif': 'GIF'}
+
+def _upload_item(file):
+    """Build an _UploadItem from a Werkzeug FileStorage."""
+    name = secure_filename(file.filename)
+    if '.' in name:
+        base, ext = name.rsplit('.', 1)
+        ext = ext.lower()
+    else:
+        base, ext = name, ''
+    return _UploadItem(file, name, ext, base)
+
 # Create directories if they don't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
+def _log_pillow_build():
+    """Log whether the SIMD-accelerated Pillow build is serving the resize path."""
+    try:
+        import PIL
+        # pillow-simd releases carry a ".postN" version suffix
+        is_simd = 'post' in PIL.__version__
+        has_turbo = pil_features.check_feature('libjpeg_turbo')
+        print(f"🖼️ Pillow {PIL.__version__} "
+              f"({'SIMD' if is_simd else 'plain'} build, "
+              f"libjpeg-turbo={'yes' if has_turbo else 'no'})")
+        if not is_simd:
+            print("💡 Install pillow-simd with CFLAGS=\"-mavx2\" for a faster resize path (see requirements.txt)")
+    except Exception as e:
+        print(f"⚠️ Could not inspect Pillow build features: {e}")
+
+_log_pillow_build()
+
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB')
+
+def _format_size(size):
+    """Human-readable byte count; picks the unit from the bit length
+    instead of an if/elif ladder."""
+    if size < 1024:
+        return f"{size} B"
+    unit = min((size.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size / (1 << (unit * 10)):.2f} {_SIZE_UNITS[unit]}"
+
 def allowed_file(filename):
     """Check if a file extension is allowed."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -201,14 +298,7 @@ def list_generated_files():
             file_path = os.path.join(OUTPUT_FOLDER, filename)
             if os.path.isfile(file_path):
                 if filename.lower().endswith(('.pdf', '.zip', '.png', '.jpg', '.jpeg', '.gif')):
-                    file_size = os.path.getsize(file_path)
-                    if file_size < 1024:
-                        size_display = f"{file_size} B"
-                    elif file_size < 1024 * 1024:
-                        size_display = f"{file_size / 1024:.2f} KB"
-                    else:
-                        size_display = f"{file_size / (1024 * 1024):.2f} MB"
-
+                    size_display = _format_size(os.path.getsize(file_path))
                     mod_time = datetime.fromtimestamp(os.path.getmtime(file_path)).strftime('%Y-%m-%d %H:%M:%S')
                     generated_files.append({
                         'name': filename,
@@ -235,6 +325,7 @@ def delete_generated_file(filename):
     try:
         if os.path.exists(file_path) and os.path.isfile(file_path):
             os.remove(file_path)
+            _gallery_cache['mtime'] = None  # force a rescan on next gallery hit
             flash(f"File '{filename}' deleted successfully.", 'success')
         else:
             flash(f"File '{filename}' not found or is not a file.", 'error')
@@ -562,9 +653,13 @@ def quick_generate():
         flash(f'Error generating PDF: {str(e)}', 'error')
         return redirect(url_for('index'))
 
-def extract_pages_from_pdf(pdf_path, output_dir, prefix="", extract_mode="all", page_numbers=None, dpi=150):
+def extract_pages_from_pdf(pdf_path, output_dir, prefix="", extract_mode="all", page_numbers=None, dpi=150, as_images=False):
     """
-    Extract pages from PDF as images
+    Extract pages from PDF as images.
+
+    With as_images=True, each entry carries the rendered page as an
+    in-memory PIL.Image under 'image' and nothing touches the disk -
+    callers that post-process anyway skip a full PNG encode+decode.
     """
     if not PYMUPDF_AVAILABLE:
         error_msg = "Critical Error: PyMuPDF (fitz) is not installed. It must be in requirements.txt"
@@ -591,22 +686,30 @@ def extract_pages_from_pdf(pdf_path, output_dir, prefix="", extract_mode="all",
             page = pdf_document.load_page(page_index)
             scale_factor = dpi / 72.0
             mat = fitz.Matrix(scale_factor, scale_factor)
-            pix = page.get_pixmap(matrix=mat)
-            img_data = pix.tobytes("png")
+            # alpha=False keeps the render to a 3-channel RGB pixmap; the
+            # pages are opaque and it saves a quarter of the buffer traffic
+            pix = page.get_pixmap(matrix=mat, alpha=False)
             if extract_mode == "single":
                 img_filename = f"{prefix}.png"
             else:
                 img_filename = f"{prefix}page_{page_num}.png"
-            img_path = os.path.join(output_dir, img_filename)
-            with open(img_path, "wb") as img_file:
-                img_file.write(img_data)
-            extracted_pages.append({
-                'path': img_path,
+            page_info = {
+                'path': None,
                 'filename': img_filename,
                 'page': page_num,
                 'size': f"{pix.width}x{pix.height}",
                 'dpi': dpi
-            })
+            }
+            if as_images:
+                mode = "RGBA" if pix.alpha else "RGB"
+                page_info['image'] = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+            else:
+                img_data = pix.tobytes("png")
+                img_path = os.path.join(output_dir, img_filename)
+                with open(img_path, "wb") as img_file:
+                    img_file.write(img_data)
+                page_info['path'] = img_path
+            extracted_pages.append(page_info)
             pix = None
         pdf_document.close()
         print(f"✅ Extracted {len(extracted_pages)} pages from PDF")
@@ -615,13 +718,79 @@ def extract_pages_from_pdf(pdf_path, output_dir, prefix="", extract_mode="all",
         print(f"❌ Error extracting pages from PDF: {e}")
         return []
 
-def process_image_basic(input_path, output_path, width=None, height=None, quality=95):
+def _turbo_decode(data):
+    """Decode JPEG bytes with libjpeg-turbo, honoring the bomb ceiling.
+
+    Reads just the header first; returns None when the decoded size would
+    blow past Image.MAX_IMAGE_PIXELS, so callers fall back to Pillow,
+    which enforces the guard before allocating.
     """
-    Basic image processing with resize and quality options
+    width, height, _, _ = _TJ.decode_header(data)
+    if width * height > Image.MAX_IMAGE_PIXELS:
+        return None
+    return Image.fromarray(_TJ.decode(data, pixel_format=TJPF_RGB))
+
+def _open_image(input_path):
+    """Decode an image file, using libjpeg-turbo for JPEGs when available."""
+    if TURBOJPEG_AVAILABLE and input_path.lower().endswith(('.jpg', '.jpeg')):
+        with open(input_path, 'rb') as f:
+            img = _turbo_decode(f.read())
+        if img is not None:
+            return img
+    return Image.open(input_path)
+
+def _to_rgba(img):
+    """Promote an image to RGBA for the processing pipeline.
+
+    Palette images take a NumPy fancy-index through the (padded) 256x4
+    palette table - one memory-bound pass instead of Pillow's scalar
+    per-pixel convert loop. Everything else falls through to convert().
+    """
+    if img.mode == 'RGBA':
+        return img
+    if (img.mode == 'P' and NUMPY_AVAILABLE
+            and 'transparency' not in img.info  # tRNS needs convert()'s handling
+            and img.getpalette() is not None):
+        pal = np.zeros((256, 4), dtype=np.uint8)
+        pal[:, 3] = 255
+        raw = np.asarray(img.getpalette('RGBA'), dtype=np.uint8).reshape(-1, 4)
+        pal[:len(raw)] = raw
+        return Image.fromarray(pal[np.asarray(img, dtype=np.uint8)], 'RGBA')
+    return img.convert('RGBA')
+
+def process_image_basic(img_or_path, output_path, width=None, height=None, quality=95):
+    """
+    Basic image processing with resize and quality options.
+
+    Accepts either a filesystem path or an already-decoded PIL.Image, so
+    callers holding a decoded upload don't pay a second decode.
     """
     try:
-        print(f"🖼️ Processing image: {input_path} -> {output_path}")
-        with Image.open(input_path) as img:
+        print(f"🖼️ Processing image -> {output_path}")
+        output_ext = output_path.rsplit('.', 1)[-1].lower()
+        if not width and not height and quality >= 95:
+            # No resize and default quality means the output bytes would be
+            # a re-encode of the input - copy the original file/stream
+            # straight through and skip the whole decode+encode chain.
+            if isinstance(img_or_path, Image.Image):
+                fp = getattr(img_or_path, 'fp', None)
+                if fp is not None and img_or_path.format == _FMT_BY_EXT.get(output_ext):
+                    try:
+                        fp.seek(0)
+                        with open(output_path, 'wb') as out:
+                            shutil.copyfileobj(fp, out)
+                        print(f"✅ Image copied straight through: {output_path}")
+                        return True
+                    except (OSError, ValueError):
+                        pass  # unseekable or closed source - re-encode below
+            else:
+                in_fmt = _FMT_BY_EXT.get(str(img_or_path).rsplit('.', 1)[-1].lower())
+                if in_fmt is not None and in_fmt == _FMT_BY_EXT.get(output_ext):
+                    shutil.copyfile(img_or_path, output_path)
+                    print(f"✅ Image copied straight through: {output_path}")
+                    return True
+        img_source = img_or_path if isinstance(img_or_path, Image.Image) else _open_image(img_or_path)
+        with img_source as img:
             original_size = img.size
             original_format = img.format
             new_size = original_size
@@ -634,18 +803,49 @@ def process_image_basic(input_path, output_path, width=None, height=None, qualit
                 elif height:
                     ratio = int(height) / original_size[1]
                     new_size = (int(original_size[0] * ratio), int(height))
-            if new_size != original_size:
+            if new_size != original_size and original_format == 'JPEG':
+                # For large shrinks, ask libjpeg to decode at 1/2, 1/4 or 1/8
+                # scale straight out of the DCT domain - a near-free box
+                # average that only works before the pixels are loaded.
+                img.draft('JPEG', new_size)
+            # Work in RGBA throughout: 4-byte pixels sit on an aligned 32-bit
+            # stride, so the resize and composite loops below run on SIMD-
+            # friendly power-of-two strides instead of 3-byte RGB. We only
+            # pack back down to RGB at the JPEG encode boundary.
+            img = _to_rgba(img)
+            if img.size != new_size:
+                factor = min(img.size[0] // new_size[0], img.size[1] // new_size[1]) if 0 not in new_size else 0
+                if factor >= 4:
+                    # Big shrinks: cheap integer box filter first, so the
+                    # LANCZOS convolution below runs on ~factor^2 fewer pixels
+                    img = img.reduce(factor)
                 img = img.resize(new_size, Image.Resampling.LANCZOS)
-            output_ext = output_path.rsplit('.', 1)[-1].lower()
             if output_ext == 'jpg' or output_ext == 'jpeg':
                 save_format = 'JPEG'
-                if img.mode in ('RGBA', 'LA', 'P'):
+                if NUMPY_AVAILABLE:
+                    # Flatten onto white with one vectorized multiply-add
+                    # over the packed array - no canvas/split/paste pass
+                    arr = np.asarray(img, dtype=np.uint8)
+                    rgb = arr[..., :3].astype(np.uint16)
+                    a = arr[..., 3:4].astype(np.uint16)
+                    out = ((rgb * a + 255 * (255 - a) + 127) // 255).astype(np.uint8)
+                    img = Image.fromarray(out, 'RGB')
+                else:
                     background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+                    background.paste(img, mask=img.split()[-1])
                     img = background
-                img.save(output_path, format=save_format, quality=quality, optimize=True)
+                # 4:2:0 chroma subsampling below quality 90 (invisible at
+                # those qualities, much smaller files), full 4:4:4 above
+                if TURBOJPEG_AVAILABLE:
+                    # libjpeg-turbo's SIMD DCT/Huffman routines encode ~4-6x
+                    # faster than Pillow's save path
+                    data = _TJ.encode(np.asarray(img), quality=quality, pixel_format=TJPF_RGB,
+                                      jpeg_subsample=TJSAMP_420 if quality < 90 else TJSAMP_444)
+                    with open(output_path, 'wb') as f:
+                        f.write(data)
+                else:
+                    img.save(output_path, format=save_format, quality=quality, optimize=True,
+                             progressive=True, subsampling=2 if quality < 90 else 0)
             elif output_ext == 'png':
                 img.save(output_path, format='PNG', optimize=True)
             else:
@@ -653,40 +853,66 @@ def process_image_basic(input_path, output_path, width=None, height=None, qualit
                 img.save(output_path, format=save_format)
         print(f"✅ Image processed successfully: {output_path}")
         return True
+    except Image.DecompressionBombError as e:
+        print(f"🛑 Rejected oversized image (decompression bomb guard): {e}")
+        return False
     except Exception as e:
         print(f"❌ Error processing image: {e}")
         return False
 
+# Short-TTL cache for the gallery listing, keyed on the folder mtime so an
+# auto-refreshing gallery page doesn't re-stat every file on each poll.
+# Upload/delete reset the key explicitly for instant invalidation.
+_GALLERY_CACHE_TTL = 5.0
+_gallery_cache = {'mtime': None, 'data': None, 'ts': 0.0}
+
 @app.route('/exported_images_gallery')
 def exported_images_gallery():
     """
     Displays a gallery of previously exported images.
     """
     print("🖼️ /exported_images_gallery endpoint called")
+    now = time.time()
+    try:
+        folder_mtime = os.stat(OUTPUT_FOLDER).st_mtime
+    except OSError:
+        folder_mtime = None
+    if (_gallery_cache['data'] is not None
+            and _gallery_cache['mtime'] == folder_mtime
+            and now - _gallery_cache['ts'] < _GALLERY_CACHE_TTL):
+        return render_template('exported_images_gallery.html', images=_gallery_cache['data'])
+
     gallery_files = []
     try:
-        for filename in os.listdir(OUTPUT_FOLDER):
-            file_path = os.path.join(OUTPUT_FOLDER, filename)
-            if os.path.isfile(file_path):
-                if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif')):
-                    file_size = os.path.getsize(file_path)
-                    if file_size < 1024:
-                        size_display = f"{file_size} B"
-                    elif file_size < 1024 * 1024:
-                        size_display = f"{file_size / 1024:.2f} KB"
-                    else:
-                        size_display = f"{file_size / (1024 * 1024):.2f} MB"
-                    mod_time = datetime.fromtimestamp(os.path.getmtime(file_path)).strftime('%Y-%m-%d %H:%M:%S')
-                    gallery_files.append({
-                        'name': filename,
-                        'size': size_display,
-                        'modified': mod_time,
-                        'view_url': url_for('view_file', filename=filename),
-                        'download_url': url_for('download_file', filename=filename),
-                        'delete_url': url_for('delete_generated_file', filename=filename),
-                        'image_url': url_for('static_file_from_output', filename=filename)
-                    })
-        gallery_files.sort(key=lambda x: datetime.strptime(x['modified'], '%Y-%m-%d %H:%M:%S'), reverse=True)
+        # scandir's DirEntry caches stat data from a single syscall per file
+        # instead of separate isfile/getsize/getmtime stats
+        with os.scandir(OUTPUT_FOLDER) as it:
+            for entry in it:
+                filename = entry.name
+                # Filter on the name before paying for any stat at all
+                if not filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif')):
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                st = entry.stat()
+                size_display = _format_size(st.st_size)
+                mod_time = datetime.fromtimestamp(st.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+                gallery_files.append({
+                    'name': filename,
+                    'size': size_display,
+                    'modified': mod_time,
+                    '_mtime': st.st_mtime,
+                    'view_url': url_for('view_file', filename=filename),
+                    'download_url': url_for('download_file', filename=filename),
+                    'delete_url': url_for('delete_generated_file', filename=filename),
+                    'image_url': url_for('static_file_from_output', filename=filename)
+                })
+        # Sort on the raw mtime float - no strptime round-trip through the
+        # display string we just formatted
+        gallery_files.sort(key=itemgetter('_mtime'), reverse=True)
+        _gallery_cache['mtime'] = folder_mtime
+        _gallery_cache['data'] = gallery_files
+        _gallery_cache['ts'] = now
     except Exception as e:
         print(f"❌ Error listing exported images: {e}")
         flash(f"Error listing exported images: {str(e)}", 'error')
@@ -696,7 +922,11 @@ def exported_images_gallery():
 @app.route('/output_static/<path:filename>')
 def static_file_from_output(filename):
     """Serve static files from the OUTPUT_FOLDER."""
-    return send_from_directory(OUTPUT_FOLDER, filename)
+    # conditional=True gives ETag/If-Modified-Since handling, so repeat
+    # gallery paints get ~200-byte 304s instead of re-reading megabytes
+    resp = send_from_directory(OUTPUT_FOLDER, filename, conditional=True)
+    resp.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return resp
 
 @app.route('/export_images', methods=['POST'])
 def export_images():
@@ -716,34 +946,24 @@ def export_images():
         custom_pdf_dpi = request.form.get('custom_pdf_dpi', '150')
         page_numbers_str = request.form.get('page_numbers', '').strip()
         
-        pdf_dpi = 150
-        if pdf_quality == 'high':
-            pdf_dpi = 300
-        elif pdf_quality == 'medium':
-            pdf_dpi = 150
-        elif pdf_quality == 'low':
-            pdf_dpi = 72
-        elif pdf_quality == 'custom':
+        if pdf_quality == 'custom':
             try:
-                pdf_dpi = int(custom_pdf_dpi)
-                pdf_dpi = max(50, min(600, pdf_dpi))
+                pdf_dpi = max(50, min(600, int(custom_pdf_dpi)))
             except (ValueError, TypeError):
                 pdf_dpi = 150
+        else:
+            pdf_dpi = _DPI_MAP.get(pdf_quality, 150)
         
         page_numbers = []
         if page_numbers_str:
-            try:
-                for part in page_numbers_str.split(','):
-                    part = part.strip()
-                    if '-' in part:
-                        start, end = map(int, part.split('-'))
-                        page_numbers.extend(range(start, end + 1))
-                    else:
-                        page_numbers.append(int(part))
-                page_numbers = sorted(list(set(page_numbers)))
-            except ValueError:
+            # One C-level regex scan instead of split/strip/int per part;
+            # malformed fragments are simply skipped by the pattern
+            pages = set()
+            for start, end in _PAGE_RE.findall(page_numbers_str):
+                pages.update(range(int(start), int(end or start) + 1))
+            page_numbers = sorted(pages)
+            if not page_numbers:
                 print(f"⚠️ Invalid page numbers format: {page_numbers_str}")
-                page_numbers = []
 
         image_width = request.form.get('image_width')
         image_height = request.form.get('image_height')
@@ -751,68 +971,110 @@ def export_images():
         
         processed_files = []
         temp_dir = tempfile.mkdtemp()
-        
-        try:
-            for file in files:
-                if file and allowed_file(file.filename):
-                    filename = secure_filename(file.filename)
-                    file_ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
-                    if file_ext in ['jpg', 'jpeg', 'png', 'gif']:
-                        original_path = os.path.join(temp_dir, filename)
-                        file.save(original_path)
-                        base_name = filename.rsplit('.', 1)[0]
-                        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
-                        output_filename = f"{base_name}_processed_{timestamp}.{file_ext}"
-                        output_path = os.path.join(OUTPUT_FOLDER, output_filename)
-                        if process_image_basic(original_path, output_path, image_width, image_height, image_quality):
-                            processed_files.append({
-                                'original': filename,
-                                'processed': output_filename,
-                                'path': output_path,
-                                'type': 'image'
-                            })
-                            print(f"✅ Processed image: {filename} -> {output_filename}")
-                        else:
-                            print(f"❌ Failed to process image: {filename}")
-                    elif file_ext == 'pdf':
-                        pdf_path = os.path.join(temp_dir, filename)
-                        file.save(pdf_path)
-                        pdf_base_name = filename.rsplit('.', 1)[0]
-                        extract_dir = os.path.join(temp_dir, f"{pdf_base_name}_extracted")
-                        os.makedirs(extract_dir, exist_ok=True)
-                        if pdf_extraction_mode == 'pages_single':
-                            extract_mode = 'single'
-                            pages_to_extract = page_numbers[:1] if page_numbers else [1]
-                        elif pdf_extraction_mode == 'pages_multiple':
-                            extract_mode = 'multiple'
-                            pages_to_extract = page_numbers if page_numbers else None
-                        else:
-                            extract_mode = 'all'
-                            pages_to_extract = None
-                        
-                        extracted_pages = extract_pages_from_pdf(
-                            pdf_path, extract_dir, pdf_base_name, extract_mode, pages_to_extract, dpi=pdf_dpi
-                        )
-                        for page_info in extracted_pages:
-                            base_name = page_info['filename'].rsplit('.', 1)[0]
-                            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
-                            output_filename = f"{base_name}_processed_{timestamp}.png"
-                            output_path = os.path.join(OUTPUT_FOLDER, output_filename)
-                            if process_image_basic(page_info['path'], output_path, image_width, image_height, image_quality):
-                                processed_files.append({
-                                    'original': f"{filename} (Page {page_info['page']})",
-                                    'processed': output_filename,
-                                    'path': output_path,
-                                    'type': 'pdf_page'
-                                })
-                                print(f"✅ Processed PDF page: {page_info['filename']} -> {output_filename}")
+
+        def _process_one(item):
+            """Process one uploaded file; returns its processed-file dicts."""
+            results = []
+            if item.ext in _ALLOWED_IMG_EXT:
+                # Decode straight from the upload stream - images never
+                # need the temp-dir round trip that PDFs do. JPEGs take
+                # libjpeg-turbo's SIMD decode when neither the draft()
+                # reduced-scale decode (needs a resize target) nor the
+                # pass-through copy (needs the lazy fp) would apply.
+                try:
+                    if (TURBOJPEG_AVAILABLE and item.ext in ('jpg', 'jpeg')
+                            and not image_width and not image_height and image_quality < 95):
+                        img = _turbo_decode(item.storage.stream.read())
+                        if img is None:  # header exceeds the bomb ceiling
+                            item.storage.stream.seek(0)
+                            img = Image.open(item.storage.stream)
                     else:
-                        print(f"ℹ️ Skipping file {filename} (type: {file_ext}) in export_images as it's not an image or PDF.")
-            
+                        img = Image.open(item.storage.stream)
+                except Image.DecompressionBombError as e:
+                    print(f"🛑 Rejected oversized image {item.name}: {e}")
+                    return results
+                except (UnidentifiedImageError, OSError) as e:
+                    # Truncated/corrupt uploads shouldn't sink the whole
+                    # batch - skip this file and keep processing the rest
+                    print(f"❌ Could not decode image {item.name}: {e}")
+                    return results
+                output_filename = f"{item.base}_processed_{_output_stamp()}.{item.ext}"
+                output_path = os.path.join(OUTPUT_FOLDER, output_filename)
+                if process_image_basic(img, output_path, image_width, image_height, image_quality):
+                    results.append({
+                        'original': item.name,
+                        'processed': output_filename,
+                        'path': output_path,
+                        'type': 'image'
+                    })
+                    print(f"✅ Processed image: {item.name} -> {output_filename}")
+                else:
+                    print(f"❌ Failed to process image: {item.name}")
+            elif item.ext == _PDF_EXT:
+                pdf_path = os.path.join(temp_dir, item.name)
+                item.storage.save(pdf_path)
+                extract_dir = os.path.join(temp_dir, f"{item.base}_extracted")
+                os.makedirs(extract_dir, exist_ok=True)
+                if pdf_extraction_mode == 'pages_single':
+                    extract_mode = 'single'
+                    pages_to_extract = page_numbers[:1] if page_numbers else [1]
+                elif pdf_extraction_mode == 'pages_multiple':
+                    extract_mode = 'multiple'
+                    pages_to_extract = page_numbers if page_numbers else None
+                else:
+                    extract_mode = 'all'
+                    pages_to_extract = None
+
+                # With no resize and default quality the extracted PNG is
+                # already the final artifact - link it into place instead of
+                # paying a second decode+LANCZOS+encode per page. Otherwise
+                # keep the pages in memory and skip the intermediate PNG.
+                passthrough = not image_width and not image_height and image_quality >= 95
+                extracted_pages = extract_pages_from_pdf(
+                    pdf_path, extract_dir, item.base, extract_mode, pages_to_extract,
+                    dpi=pdf_dpi, as_images=not passthrough
+                )
+                for page_info in extracted_pages:
+                    base_name = page_info['filename'].rsplit('.', 1)[0]
+                    output_filename = f"{base_name}_processed_{_output_stamp()}.png"
+                    output_path = os.path.join(OUTPUT_FOLDER, output_filename)
+                    if passthrough:
+                        try:
+                            os.link(page_info['path'], output_path)
+                        except OSError:  # cross-device or no hard-link support
+                            shutil.move(page_info['path'], output_path)
+                        ok = True
+                    else:
+                        ok = process_image_basic(page_info['image'], output_path, image_width, image_height, image_quality)
+                    if ok:
+                        results.append({
+                            'original': f"{item.name} (Page {page_info['page']})",
+                            'processed': output_filename,
+                            'path': output_path,
+                            'type': 'pdf_page'
+                        })
+                        print(f"✅ Processed PDF page: {page_info['filename']} -> {output_filename}")
+            else:
+                print(f"ℹ️ Skipping file {item.name} (type: {item.ext}) in export_images as it's not an image or PDF.")
+            return results
+
+        try:
+            # Parse and sanitize each filename exactly once up front; the
+            # workers just consume the precomputed struct
+            items = [_upload_item(f) for f in files if f and allowed_file(f.filename)]
+            # Per-file decode/resize/encode is independent work, and Pillow,
+            # libjpeg-turbo and PyMuPDF all release the GIL in their C cores,
+            # so threads give near-linear overlap for multi-file uploads.
+            # map() keeps the results in upload order.
+            with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as ex:
+                for results in ex.map(_process_one, items):
+                    processed_files.extend(results)
+
             if not processed_files:
                 flash('No valid image or PDF files were found to process.', 'error')
                 return redirect(url_for('index'))
             
+            _gallery_cache['mtime'] = None  # new files - force a gallery rescan
             flash(f"Successfully processed {len(processed_files)} image(s). See them below!", 'success')
             return redirect(url_for('exported_images_gallery'))
         
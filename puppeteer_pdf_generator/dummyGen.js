@@ -3,6 +3,7 @@ const puppeteer = require('puppeteer-core');
 const fs = require('fs');
 const os = require('os');
 const path = require('path');
+const readline = require('readline');
 
 // Helper function to find the default path for Chrome
 function getChromeExecutablePath() {
@@ -25,39 +26,37 @@ function getChromeExecutablePath() {
     process.exit(1);
 }
 
+function launchBrowser() {
+    // Get the path to the user's installed Chrome
+    const executablePath = getChromeExecutablePath();
 
-async function generateExactPdf() {
-    const args = JSON.parse(process.argv[2]);
+    // Launch Puppeteer using the found Chrome executable
+    return puppeteer.launch({
+        executablePath,
+        headless: true,
+        args: [
+            '--no-sandbox',
+            '--disable-setuid-sandbox',
+            '--disable-dev-shm-usage'
+        ]
+    });
+}
+
+// Render one job on an already-running browser. Throws on failure so both
+// the single-shot and daemon entry points can report errors their own way.
+async function renderPdf(browser, args) {
     const htmlPath = args.htmlPath;
     const outputPath = args.outputPath;
     const deviceWidth = args.deviceWidth || 610;
     const viewType = args.viewType || 'desktop';
 
     if (!htmlPath || !fs.existsSync(htmlPath)) {
-        console.error('❌ Error: HTML input file path is missing or does not exist.');
-        process.exit(1);
+        throw new Error('HTML input file path is missing or does not exist.');
     }
     const htmlContent = fs.readFileSync(htmlPath, 'utf8');
 
-    let browser;
+    const page = await browser.newPage();
     try {
-        // Get the path to the user's installed Chrome
-        const executablePath = getChromeExecutablePath();
-
-        // Launch Puppeteer using the found Chrome executable
-        browser = await puppeteer.launch({
-            executablePath, // <-- THIS IS THE IMPORTANT NEW PART
-            headless: true,
-            args: [
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-dev-shm-usage'
-            ]
-        });
-
-        // ... (the rest of your code is exactly the same) ...
-
-        const page = await browser.newPage();
         const defaultDesktopWidth = 600;
         const mobileWidth = 360;
         let viewportWidth;
@@ -74,7 +73,7 @@ async function generateExactPdf() {
             viewportWidth = defaultDesktopWidth;
             pdfTitle = 'Desktop View PDF';
         }
-        
+
         await page.setViewport({
             width: viewportWidth,
             height: 800,
@@ -89,7 +88,7 @@ async function generateExactPdf() {
         if (!finalHtmlContent.includes('<head>')) {
             finalHtmlContent = finalHtmlContent.replace('<body>', '<head></head><body>');
         }
-        
+
         const metaViewportTag = `<meta name="viewport" content="width=device-width, initial-scale=1.0, shrink-to-fit=no">`;
         if (!finalHtmlContent.includes('<meta name="viewport"')) {
             const headEndIndex = finalHtmlContent.indexOf('</head>');
@@ -99,7 +98,7 @@ async function generateExactPdf() {
                     finalHtmlContent.substring(headEndIndex);
             }
         }
-        
+
         const htmlTitleContent = pdfTitle.replace(' PDF', '');
         if (!finalHtmlContent.includes('<title>')) {
             const headStartTagIndex = finalHtmlContent.indexOf('<head>');
@@ -109,17 +108,17 @@ async function generateExactPdf() {
                     finalHtmlContent.substring(headStartTagIndex + '<head>'.length);
             }
         }
-        
+
         await page.setContent(finalHtmlContent, { waitUntil: 'networkidle0' });
         await page.emulateMediaType('screen');
-        
+
         await page.waitForFunction(() => {
             const images = Array.from(document.querySelectorAll('img'));
             return images.every(img => img.complete || img.naturalWidth === 0);
-        }, { timeout: 10000 }).catch(() => console.log('Some images might not have loaded within timeout.'));
+        }, { timeout: 10000 }).catch(() => console.error('Some images might not have loaded within timeout.'));
         await page.evaluateHandle('document.fonts.ready');
         await new Promise(resolve => setTimeout(resolve, 500));
-        
+
         const contentHeight = await page.evaluate(() => {
             let lastVisibleElement = null;
             let maxBottom = 0;
@@ -143,31 +142,48 @@ async function generateExactPdf() {
             }
             return Math.ceil(document.body.getBoundingClientRect().bottom);
         });
-        
+
         await page.setViewport({
             width: viewportWidth,
             height: contentHeight,
             deviceScaleFactor: deviceScaleFactor,
             isMobile: (viewType === 'mobile')
         });
-        
+
         const pdfWidthInches = viewportWidth / 96;
         const pdfHeightInches = contentHeight / 96;
-        
-        await page.pdf({
+
+        const pdfOptions = {
             path: outputPath,
             printBackground: true,
             width: `${pdfWidthInches}in`,
             height: `${pdfHeightInches}in`,
             margin: { top: '0', right: '0', bottom: '0', left: '0' },
-            pageRanges: '1',
             preferCSSPageSize: true,
             displayHeaderFooter: false
-        });
-        
-        console.log(`✅ PDF generated successfully at ${outputPath}`);
-        process.exit(0);
+        };
+        if (!args.fullDocument) {
+            // Preview renders size the page to the full content height, so
+            // clamping to page 1 just drops a stray trailing blank. Config
+            // documents paginate through @page/page-break CSS and need every
+            // page emitted.
+            pdfOptions.pageRanges = '1';
+        }
+        await page.pdf(pdfOptions);
+    } finally {
+        await page.close();
+    }
+}
 
+// Original one-job-per-process mode: launch, render, exit
+async function runSingleShot() {
+    const args = JSON.parse(process.argv[2]);
+    let browser;
+    try {
+        browser = await launchBrowser();
+        await renderPdf(browser, args);
+        console.log(`✅ PDF generated successfully at ${args.outputPath}`);
+        process.exit(0);
     } catch (error) {
         console.error('❌ Error generating PDF:', error);
         process.exit(1);
@@ -178,4 +194,29 @@ async function generateExactPdf() {
     }
 }
 
-generateExactPdf();
+// Daemon mode: launch Chromium once, then read one JSON job per stdin line
+// and answer with one JSON result per stdout line. This amortizes the 1-2s
+// browser startup across every render after the first.
+async function runDaemon() {
+    const browser = await launchBrowser();
+    const rl = readline.createInterface({ input: process.stdin, terminal: false });
+    for await (const line of rl) {
+        if (!line.trim()) continue;
+        let result;
+        try {
+            const args = JSON.parse(line);
+            await renderPdf(browser, args);
+            result = { success: true, outputPath: args.outputPath };
+        } catch (error) {
+            result = { success: false, error: String(error) };
+        }
+        process.stdout.write(JSON.stringify(result) + '\n');
+    }
+    await browser.close();
+}
+
+if (process.argv.includes('--daemon')) {
+    runDaemon();
+} else {
+    runSingleShot();
+}
@@ -0,0 +1,15 @@
+"""
+WSGI entry point for production deployment.
+
+The werkzeug dev server started by `python app.py` is single-threaded
+and runs with the debugger active - fine for local use, a hard ceiling
+for a CPU-bound PDF service. In production run:
+
+    gunicorn --workers=$(nproc) --preload --timeout 120 --worker-tmp-dir /dev/shm wsgi:application
+
+--preload imports the app once in the master process, so the heavy
+modules (fitz, xhtml2pdf, lxml) and module-level caches are shared
+copy-on-write across the forked workers instead of duplicated per worker.
+"""
+
+from app import app as application